@@ -13,6 +13,7 @@ import difflib
 import glob
 import logging
 import os
+import re
 import shutil
 import stat
 import string
@@ -26,6 +27,121 @@ import source_formatter
 import sources
 
 
+class CompiledTemplate(object):
+  """Template string that is split into literals and placeholders once.
+
+  The literals and placeholders are used to build a render function that joins
+  the literals and the mapped values in a single expression, instead of
+  scanning the template string every time it is substituted.
+
+  Attributes:
+    template (str): template string.
+  """
+
+  # Note that the format string is a native str so that values are converted
+  # in the same way as string.Template does.
+  _VALUE_FORMAT = str('%s')
+
+  def __init__(self, template):
+    """Initializes a compiled template.
+
+    Args:
+      template (str): template string.
+    """
+    super(CompiledTemplate, self).__init__()
+    self._has_invalid_placeholder = False
+    self._keys = ()
+    self._literals = ()
+    self._render_function = None
+    self.template = template
+
+    self._Compile()
+
+    if not self._has_invalid_placeholder:
+      self._render_function = self._CreateRenderFunction()
+
+  def _Compile(self):
+    """Splits the template string into literals and placeholder names."""
+    keys = []
+    literals = []
+    literal_parts = []
+    template_offset = 0
+
+    for match in string.Template.pattern.finditer(self.template):
+      literal_parts.append(self.template[template_offset:match.start()])
+      template_offset = match.end()
+
+      if match.group('escaped') is not None:
+        literal_parts.append(string.Template.delimiter)
+        continue
+
+      key = match.group('named') or match.group('braced')
+      if key is None:
+        self._has_invalid_placeholder = True
+        break
+
+      keys.append(key)
+      literals.append(self.template[:0].join(literal_parts))
+      literal_parts = []
+
+    literal_parts.append(self.template[template_offset:])
+    literals.append(self.template[:0].join(literal_parts))
+
+    self._keys = tuple(keys)
+    self._literals = tuple(literals)
+
+  def _CreateRenderFunction(self):
+    """Creates a function that renders the template string.
+
+    Returns:
+      function: function that takes the template mappings and returns
+          the template string with the placeholders substituted.
+    """
+    expressions = ['literals[0]']
+    for index, key in enumerate(self._keys):
+      # The placeholder names are identifiers, so their representation can
+      # be used as a literal in the function source. Note that the function
+      # source is compiled without the future statements of this module so
+      # that the literal keeps the type of the placeholder name.
+      expressions.append('value_format % (mapping[{0!r}],)'.format(key))
+      expressions.append('literals[{0:d}]'.format(index + 1))
+
+    function_source = '\n'.join([
+        'def _Render(mapping):',
+        '  return join(({0:s},))'.format(', '.join(expressions)),
+        ''])
+
+    namespace = {
+        'join': self.template[:0].join,
+        'literals': self._literals,
+        'value_format': self._VALUE_FORMAT}
+
+    code_object = compile(
+        function_source, '<template>', 'exec', 0, True)
+    exec(code_object, namespace)  # pylint: disable=exec-used
+
+    return namespace['_Render']
+
+  def substitute(self, mapping):
+    """Substitutes the placeholders in the template string.
+
+    Args:
+      mapping (dict[str, str]): template mappings, where the key maps to
+          the name of a template variable.
+
+    Returns:
+      str: template string with the placeholders substituted.
+
+    Raises:
+      KeyError: if a placeholder is missing from the mapping.
+      ValueError: if the template string contains an invalid placeholder.
+    """
+    if self._has_invalid_placeholder:
+      return string.Template(self.template).substitute(mapping)
+
+    return self._render_function(mapping)
+
+
 class DefinitionsIncludeHeaderFile(object):
   """Definitions include header file.
 
@@ -311,14 +427,21 @@ class LibraryIncludeHeaderFile(object):
     functions_per_name (dict[str, list[FunctionPrototype]]): function
         prototypes per name.
     functions_per_section (dict[str, list[FunctionPrototype]]): function
-        prototypes per section.
+        prototypes per section name, where the function prototypes of
+        sections with the same name are combined.
     have_bfio (bool): True if the include header supports libbfio.
     have_wide_character_type (bool): True if the include header supports
         the wide character type.
     name (str): name.
     section_names (list[str]): section names.
+    sections (list[tuple[str, list[FunctionPrototype]]]): section name and
+        function prototypes of every section, in the order they are defined
+        in the include header.
   """
 
+  _FUNCTION_ARGUMENT_RE = re.compile(
+      br'^(?:(?P<last_argument>.*) \);|(?P<argument>[^,]*).*)$')
+
   _SIGNATURE_TYPES = ('container', 'file', 'handle', 'store', 'volume')
 
   def __init__(self, path):
@@ -343,6 +466,7 @@ class LibraryIncludeHeaderFile(object):
     self.have_wide_character_type = False
     self.name = os.path.basename(path)
     self.section_names = []
+    self.sections = []
 
   def _AnalyzeFunctionGroups(self):
     """Analyzes the library include header file for function groups."""
@@ -556,6 +680,9 @@ class LibraryIncludeHeaderFile(object):
     self.have_bfio = False
     self.have_wide_character_type = False
     self.section_names = []
+    self.sections = []
+
+    library_name = b'{0:s}'.format(self._library_name)
 
     define_deprecated = b'{0:s}_DEPRECATED'.format(self._library_name.upper())
 
@@ -570,6 +697,24 @@ class LibraryIncludeHeaderFile(object):
         b'#if defined( {0:s}_HAVE_WIDE_CHARACTER_TYPE )').format(
             self._library_name.upper())
 
+    define_if_defined = b'#if defined( '
+
+    section_separator = (
+        b'/* -------------------------------------------------------------'
+        b'------------')
+
+    # The first 3 bytes of the lines that start a section or contain
+    # a directive that is tracked, used to skip other lines with a single
+    # lookup.
+    line_prefixes = frozenset([
+        b'#en', b'#if', define_deprecated[:3], define_extern[:3],
+        section_separator[:3]])
+
+    # Bind the attributes used for every function prototype to local
+    # variables to prevent repeated lookups in the loop.
+    functions_per_name = self.functions_per_name
+    match_function_argument = self._FUNCTION_ARGUMENT_RE.match
+
     function_argument = None
     function_prototype = None
     have_bfio = False
@@ -578,28 +723,35 @@ class LibraryIncludeHeaderFile(object):
     have_wide_character_type = False
     in_define_deprecated = False
     in_section = False
+    section_functions = None
     section_name = None
+    section_name_functions = None
 
+    # Note that stripping every line is faster than tracking white space
+    # offsets into the file data, since the offsets would need to be
+    # determined by Python code instead of by bytes.strip().
     with open(self._path, 'rb') as file_object:
-      for line in file_object.readlines():
+      for line in file_object:
         line = line.strip()
 
         if have_extern:
-          line = line.decode('ascii')
-
           if function_prototype:
+            # Get the argument before the ',' or the last argument before
+            # the ' );'.
+            match = match_function_argument(line)
+            last_argument_string = match.group('last_argument')
+
             # Check if we have a callback function argument.
-            if line.endswith('('):
-              argument_string = '{0:s} '.format(line)
+            if line.endswith(b'('):
+              argument_string = b'{0:s} '.format(line)
               function_argument = sources.FunctionArgument(argument_string)
 
             else:
-              if line.endswith(' );'):
-                argument_string = line[:-3]
+              if last_argument_string is not None:
+                argument_string = last_argument_string
 
               else:
-                # Get the part of the line before the ','.
-                argument_string, _, _ = line.partition(',')
+                argument_string = match.group('argument')
 
               if not function_argument:
                 function_prototype.AddArgumentString(argument_string)
@@ -607,37 +759,37 @@ class LibraryIncludeHeaderFile(object):
               else:
                 function_argument.AddArgumentString(argument_string)
 
-            if function_argument and line.endswith(' ),'):
+            if function_argument and line.endswith(b' ),'):
               function_prototype.AddArgument(function_argument)
               function_argument = None
 
-            elif line.endswith(' );'):
+            elif last_argument_string is not None:
               if not in_define_deprecated:
-                # TODO: handle section_name is None
-                self.functions_per_name[function_prototype.name] = (
+                # TODO: handle section_functions is None
+                functions_per_name[function_prototype.name] = (
                     function_prototype)
 
-                self.functions_per_section[section_name].append(
-                    function_prototype)
+                section_functions.append(function_prototype)
+                section_name_functions.append(function_prototype)
 
               function_prototype = None
               in_define_deprecated = False
               have_extern = False
 
-          elif line.endswith(';'):
+          elif line.endswith(b';'):
             # The line contains a variable definition.
             have_extern = False
 
           else:
             # Get the part of the line before the library name.
-            data_type, _, _ = line.partition(self._library_name)
+            data_type, _, _ = line.partition(library_name)
 
             # Get the part of the line after the data type.
             line = line[len(data_type):]
             data_type = data_type.strip()
 
             # Get the part of the remainder of the line before the '('.
-            name, _, _ = line.partition('(')
+            name, _, _ = line.partition(b'(')
 
             function_prototype = sources.FunctionPrototype(name, data_type)
             function_prototype.have_bfio = have_bfio
@@ -654,34 +806,37 @@ class LibraryIncludeHeaderFile(object):
         elif in_section:
           if line.startswith(b'* '):
             section_name = line[2:]
+            section_functions = []
             self.section_names.append(section_name)
-            self.functions_per_section[section_name] = []
+            self.sections.append((section_name, section_functions))
+            section_name_functions = self.functions_per_section.setdefault(
+                section_name, [])
             in_section = False
 
-        elif line == (
-            b'/* -------------------------------------------------------------'
-            b'------------'):
-          in_section = True
+        elif line[:3] in line_prefixes:
+          if line == section_separator:
+            in_section = True
 
-        elif line.startswith(define_deprecated):
-          in_define_deprecated = True
+          elif line.startswith(define_deprecated):
+            in_define_deprecated = True
 
-        elif line.startswith(define_have_bfio):
-          have_bfio = True
+          elif line.startswith(define_extern):
+            have_extern = True
 
-        elif line.startswith(define_extern):
-          have_extern = True
+          elif line.startswith(define_if_defined):
+            if line.startswith(define_have_bfio):
+              have_bfio = True
 
-        elif line.startswith(define_have_debug_output):
-          have_debug_output = True
+            elif line.startswith(define_have_debug_output):
+              have_debug_output = True
 
-        elif line.startswith(define_have_wide_character_type):
-          have_wide_character_type = True
+            elif line.startswith(define_have_wide_character_type):
+              have_wide_character_type = True
 
-        elif line.startswith(b'#endif'):
-          have_bfio = False
-          have_debug_output = False
-          have_wide_character_type = False
+          elif line.startswith(b'#endif'):
+            have_bfio = False
+            have_debug_output = False
+            have_wide_character_type = False
 
 
 class LibraryMakefileAMFile(object):
@@ -879,7 +1034,11 @@ class SourceFileGenerator(object):
     self._library_path = None
     self._projects_directory = projects_directory
     self._python_module_path = None
+    self._template_cache = {}
     self._template_directory = template_directory
+    self._template_files = None
+    self._template_mappings_cache = {}
+    self._template_mappings_configuration = None
     self._tests_path = None
     self._tools_path = None
     self._types_include_header_file = None
@@ -898,13 +1057,9 @@ class SourceFileGenerator(object):
       output_filename (str): name of the output file.
       access_mode (Optional[str]): output file access mode.
     """
-    template_string = self._ReadTemplateFile(template_filename)
-    try:
-      output_data = template_string.substitute(template_mappings)
-    except (KeyError, ValueError) as exception:
-      logging.error(
-          'Unable to format template: {0:s} with error: {1:s}'.format(
-              template_filename, exception))
+    output_data = self._SubstituteTemplateFile(
+        template_filename, template_mappings)
+    if output_data is None:
       return
 
     output_writer.WriteFile(
@@ -998,9 +1153,31 @@ class SourceFileGenerator(object):
 
     return makefile_am_file
 
+  def _GetTemplateFiles(self):
+    """Retrieves the files in the template directory.
+
+    The directory is only scanned the first time the files are retrieved.
+
+    Returns:
+      list[tuple[str, str]]: name and path of every file in the template
+          directory.
+    """
+    if self._template_files is None:
+      self._template_files = []
+      for directory_entry in os.listdir(self._template_directory):
+        template_filename = os.path.join(
+            self._template_directory, directory_entry)
+        if os.path.isfile(template_filename):
+          self._template_files.append((directory_entry, template_filename))
+
+    return self._template_files
+
   def _GetTemplateMappings(self, project_configuration, authors_separator=', '):
     """Retrieves the template mappings.
 
+    The template mappings are cached per project configuration and authors
+    separator. A copy is returned so that callers can add or change mappings.
+
     Args:
       project_configuration (ProjectConfiguration): project configuration.
       authors_separator (Optional[str]): authors separator.
@@ -1012,6 +1189,15 @@ class SourceFileGenerator(object):
     Raises:
       ValueError: if the year of creation value is out of bounds.
     """
+    if project_configuration is not self._template_mappings_configuration:
+      self._template_mappings_cache = {}
+      self._template_mappings_configuration = project_configuration
+
+    template_mappings = self._template_mappings_cache.get(
+        authors_separator, None)
+    if template_mappings:
+      return dict(template_mappings)
+
     date = datetime.date.today()
     if project_configuration.project_year_of_creation > date.year:
       raise ValueError('Year of creation value out of bounds.')
@@ -1068,7 +1254,9 @@ class SourceFileGenerator(object):
 
         'tests_authors': tests_authors,
     }
-    return template_mappings
+    self._template_mappings_cache[authors_separator] = template_mappings
+
+    return dict(template_mappings)
 
   def _GetTypeLibraryHeaderFile(self, project_configuration, type_name):
     """Retrieves a type specific library include header file.
@@ -1154,16 +1342,29 @@ class SourceFileGenerator(object):
   def _ReadTemplateFile(self, filename):
     """Reads a template string from file.
 
+    Template strings are cached per absolute path and are read again if
+    the modification time of the file changed.
+
     Args:
       filename (str): name of the file containing the template string.
 
     Returns:
-      string.Template: template string.
+      CompiledTemplate: template string.
     """
+    filename = os.path.abspath(filename)
+    modification_time = os.stat(filename).st_mtime
+
+    cached_template = self._template_cache.get(filename, None)
+    if cached_template and cached_template[0] == modification_time:
+      return cached_template[1]
+
     with open(filename, 'rb') as file_object:
       file_data = file_object.read()
 
-    return string.Template(file_data)
+    template_string = CompiledTemplate(file_data)
+    self._template_cache[filename] = (modification_time, template_string)
+
+    return template_string
 
   def _SetSequenceTypeNameInTemplateMappings(
       self, template_mappings, type_name):
@@ -1353,6 +1554,26 @@ class SourceFileGenerator(object):
 
     lines = formatter.FormatSource(lines)
 
+  def _SubstituteTemplateFile(self, template_filename, template_mappings):
+    """Substitutes the template mappings in a template file.
+
+    Args:
+      template_filename (str): name of the template file.
+      template_mappings (dict[str, str]): template mappings, where the key
+          maps to the name of a template variable.
+
+    Returns:
+      str: output data or None if the template could not be formatted.
+    """
+    template_string = self._ReadTemplateFile(template_filename)
+    try:
+      return template_string.substitute(template_mappings)
+    except (KeyError, ValueError) as exception:
+      logging.error(
+          'Unable to format template: {0:s} with error: {1:s}'.format(
+              template_filename, exception))
+      return None
+
   def _VerticalAlignAssignmentStatements(self, output_filename):
     """Vertically aligns assignment statements.
 
@@ -3088,9 +3309,8 @@ class LibrarySourceFileGenerator(SourceFileGenerator):
     template_mappings['library_type_definitions'] = '\n'.join(
         type_definitions)
 
-    authors_template_mapping = template_mappings['authors']
-
-    for directory_entry in os.listdir(self._template_directory):
+    generate_arguments = []
+    for directory_entry, template_filename in self._GetTemplateFiles():
       if not directory_entry.startswith('libyal'):
         continue
 
@@ -3130,11 +3350,6 @@ class LibrarySourceFileGenerator(SourceFileGenerator):
               'libcerror', 'libcthreads'))):
         continue
 
-      template_filename = os.path.join(
-          self._template_directory, directory_entry)
-      if not os.path.isfile(template_filename):
-        continue
-
       output_filename = '{0:s}{1:s}'.format(
           project_configuration.library_name, directory_entry[6:])
       output_filename = os.path.join(
@@ -3145,14 +3360,20 @@ class LibrarySourceFileGenerator(SourceFileGenerator):
           'libyal_support.h', 'libyal_unused.h'):
         continue
 
+      source_file_template_mappings = dict(template_mappings)
       if directory_entry == 'libyal.rc.in':
-        template_mappings['authors'] = ', '.join(
+        source_file_template_mappings['authors'] = ', '.join(
             project_configuration.project_authors)
-      else:
-        template_mappings['authors'] = authors_template_mapping
 
+      generate_arguments.append((
+          directory_entry, template_filename, source_file_template_mappings,
+          output_filename))
+
+    for (directory_entry, template_filename, source_file_template_mappings,
+         output_filename) in generate_arguments:
       self._GenerateSection(
-          template_filename, template_mappings, output_writer, output_filename)
+          template_filename, source_file_template_mappings, output_writer,
+          output_filename)
 
       if directory_entry in ('libyal_codepage.h', 'libyal_types.h'):
         self._VerticalAlignTabs(output_filename)
@@ -3178,6 +3399,8 @@ class LibraryManPageGenerator(SourceFileGenerator):
     backup_filename = '{0:s}.{1:d}'.format(output_filename, os.getpid())
     shutil.copyfile(output_filename, backup_filename)
 
+    output_writer = BufferedOutputWriter(output_writer)
+
     template_mappings['date'] = time.strftime(
         '%B %d, %Y', time.gmtime()).replace(' 0', '  ')
 
@@ -3185,21 +3408,31 @@ class LibraryManPageGenerator(SourceFileGenerator):
     self._GenerateSection(
         template_filename, template_mappings, output_writer, output_filename)
 
-    have_wide_character_type_functions = False
-    for section_name in include_header_file.section_names:
-      functions_per_section = include_header_file.functions_per_section.get(
-          section_name, [])
+    function_template_filename = os.path.join(
+        self._template_directory, 'function.txt')
+    section_template_filename = os.path.join(
+        self._template_directory, 'section.txt')
+
+    # The mappings are changed in place for every section and function
+    # prototype instead of being created again.
+    function_template_mappings = {
+        'function_arguments': None,
+        'function_name': None,
+        'function_return_type': None,
+    }
+    section_template_mappings = {
+        'section_name': None,
+    }
 
+    have_wide_character_type_functions = False
+    for section_name, functions_per_section in include_header_file.sections:
       if not functions_per_section:
         continue
 
-      section_template_mappings = {
-          'section_name': section_name,
-      }
-      template_filename = os.path.join(self._template_directory, 'section.txt')
+      section_template_mappings['section_name'] = section_name
       self._GenerateSection(
-          template_filename, section_template_mappings, output_writer,
-          output_filename, access_mode='ab')
+          section_template_filename, section_template_mappings,
+          output_writer, output_filename, access_mode='ab')
 
       bfio_functions = []
       debug_output_functions = []
@@ -3216,69 +3449,52 @@ class LibraryManPageGenerator(SourceFileGenerator):
           functions.append(function_prototype)
 
       for function_prototype in functions:
-        function_arguments_string = function_prototype.CopyToString()
-        function_template_mappings = {
-            'function_arguments': function_arguments_string,
-            'function_name': function_prototype.name,
-            'function_return_type': function_prototype.return_type,
-        }
-        template_filename = os.path.join(
-            self._template_directory, 'function.txt')
+        function_template_mappings['function_arguments'] = (
+            function_prototype.CopyToString())
+        function_template_mappings['function_name'] = function_prototype.name
+        function_template_mappings['function_return_type'] = (
+            function_prototype.return_type)
         self._GenerateSection(
-            template_filename, function_template_mappings, output_writer,
-            output_filename, access_mode='ab')
+            function_template_filename, function_template_mappings,
+            output_writer, output_filename, access_mode='ab')
 
       if wide_character_type_functions:
         have_wide_character_type_functions = True
 
         # Ignore adding the wide string support section header in some cases.
         if project_configuration.library_name != 'libcsplit':
-          section_template_mappings = {
-              'section_name': (
-                  'Available when compiled with wide character string support:')
-          }
-          template_filename = os.path.join(
-              self._template_directory, 'section.txt')
+          section_template_mappings['section_name'] = (
+              'Available when compiled with wide character string support:')
           self._GenerateSection(
-              template_filename, section_template_mappings, output_writer,
-              output_filename, access_mode='ab')
+              section_template_filename, section_template_mappings,
+              output_writer, output_filename, access_mode='ab')
 
         for function_prototype in wide_character_type_functions:
-          function_arguments_string = function_prototype.CopyToString()
-          function_template_mappings = {
-              'function_arguments': function_arguments_string,
-              'function_name': function_prototype.name,
-              'function_return_type': function_prototype.return_type,
-          }
-          template_filename = os.path.join(
-              self._template_directory, 'function.txt')
+          function_template_mappings['function_arguments'] = (
+              function_prototype.CopyToString())
+          function_template_mappings['function_name'] = function_prototype.name
+          function_template_mappings['function_return_type'] = (
+              function_prototype.return_type)
           self._GenerateSection(
-              template_filename, function_template_mappings, output_writer,
-              output_filename, access_mode='ab')
+              function_template_filename, function_template_mappings,
+              output_writer, output_filename, access_mode='ab')
 
       if bfio_functions:
-        section_template_mappings = {
-            'section_name': (
-                'Available when compiled with libbfio support:')
-        }
-        template_filename = os.path.join(
-            self._template_directory, 'section.txt')
+        section_template_mappings['section_name'] = (
+            'Available when compiled with libbfio support:')
         self._GenerateSection(
-            template_filename, section_template_mappings, output_writer,
-            output_filename, access_mode='ab')
+            section_template_filename, section_template_mappings,
+            output_writer, output_filename, access_mode='ab')
 
         for function_prototype in bfio_functions:
-          function_arguments_string = function_prototype.CopyToString()
-          function_template_mappings = {
-              'function_arguments': function_arguments_string,
-              'function_name': function_prototype.name,
-              'function_return_type': function_prototype.return_type,
-          }
-          template_filename = os.path.join(
-              self._template_directory, 'function.txt')
+          function_template_mappings['function_arguments'] = (
+              function_prototype.CopyToString())
+          function_template_mappings['function_name'] = function_prototype.name
+          function_template_mappings['function_return_type'] = (
+              function_prototype.return_type)
           self._GenerateSection(
-              template_filename, function_template_mappings, output_writer,
-              output_filename, access_mode='ab')
+              function_template_filename, function_template_mappings,
+              output_writer, output_filename, access_mode='ab')
 
       # TODO: add support for debug output functions.
 
@@ -3306,11 +3522,21 @@ class LibraryManPageGenerator(SourceFileGenerator):
         template_filename, template_mappings, output_writer, output_filename,
         access_mode='ab')
 
-    backup_file = open(backup_filename, 'rb')
-    backup_lines = backup_file.readlines()
+    output_data = output_writer.GetFileData(output_filename)
+    output_writer.Flush()
+
+    with open(backup_filename, 'rb') as backup_file:
+      backup_data = backup_file.read()
 
-    output_file = open(output_filename, 'rb')
-    output_lines = output_file.readlines()
+    # Compare against the generated data instead of reading the output file
+    # back in, unless the generated data does not contain the whole file,
+    # for example because the header template could not be formatted.
+    if output_data is None:
+      with open(output_filename, 'rb') as output_file:
+        output_data = output_file.read()
+
+    backup_lines = backup_data.splitlines(True)
+    output_lines = output_data.splitlines(True)
 
     diff_lines = list(difflib.ndiff(backup_lines[1:], output_lines[1:]))
     diff_lines = [line for line in diff_lines if line.startswith(b'-')]
@@ -9232,6 +9458,76 @@ class ToolsSourceFileGenerator(SourceFileGenerator):
         project_configuration, template_mappings, output_writer)
 
 
+class BufferedOutputWriter(object):
+  """Buffered output writer.
+
+  Keeps the data written per file in memory until the writer is flushed so
+  that every file is written with a single call to the output writer.
+  """
+
+  def __init__(self, output_writer):
+    """Initialize a buffered output writer.
+
+    Args:
+      output_writer (FileWriter|StdoutWriter): output writer to write
+          the buffered data to.
+    """
+    super(BufferedOutputWriter, self).__init__()
+    self._access_modes = {}
+    self._buffers = collections.OrderedDict()
+    self._output_writer = output_writer
+
+  def Flush(self):
+    """Writes the buffered data to the output writer."""
+    for file_path, file_data in self._buffers.items():
+      self._output_writer.WriteFile(
+          file_path, b''.join(file_data),
+          access_mode=self._access_modes[file_path])
+
+    self._access_modes = {}
+    self._buffers = collections.OrderedDict()
+
+  def GetFileData(self, file_path):
+    """Retrieves the data buffered for a file.
+
+    Args:
+      file_path (str): path of the file.
+
+    Returns:
+      bytes: data buffered for the file or None if no data was written to
+          the file since the last flush or if the buffered data is appended
+          to the file and therefore does not contain the whole file.
+    """
+    file_data = self._buffers.get(file_path, None)
+    if file_data is None or self._access_modes[file_path].startswith('a'):
+      return None
+
+    # Keep the joined data so that it is not joined again on flush.
+    file_data = b''.join(file_data)
+    self._buffers[file_path] = [file_data]
+
+    return file_data
+
+  def WriteFile(self, file_path, file_data, access_mode='wb'):
+    """Buffers the data to write to file.
+
+    Args:
+      file_path (str): path of the file to write.
+      file_data (bytes|str): data to write.
+      access_mode (Optional[str]): output file access mode.
+    """
+    # Encode Unicode data in the same way a binary file object does, so that
+    # it can be joined with the byte string data of other sections.
+    if not isinstance(file_data, bytes):
+      file_data = file_data.encode(sys.getdefaultencoding())
+
+    if file_path not in self._buffers or not access_mode.startswith('a'):
+      self._access_modes[file_path] = access_mode
+      self._buffers[file_path] = []
+
+    self._buffers[file_path].append(file_data)
+
+
 class FileWriter(object):
   """File output writer."""
 
@@ -9242,7 +9538,6 @@ class FileWriter(object):
       output_directory: string containing the path of the output directory.
     """
     super(FileWriter, self).__init__()
-    self._file_object = None
     self._output_directory = output_directory
 
   def WriteFile(self, file_path, file_data, access_mode='wb'):
@@ -9253,9 +9548,8 @@ class FileWriter(object):
       file_data: binary string containing the data to write.
       access_mode: optional string containing the output file access mode.
     """
-    self._file_object = open(file_path, access_mode)
-    self._file_object.write(file_data)
-    self._file_object.close()
+    with open(file_path, access_mode) as file_object:
+      file_object.write(file_data)
 
 
 class StdoutWriter(object):
@@ -95,6 +95,7 @@ class FunctionPrototype(object):
       return_type (str): return type.
     """
     super(FunctionPrototype, self).__init__()
+    self._arguments_string = None
     self.arguments = []
     self.have_bfio = False
     self.have_debug_output = False
@@ -111,6 +112,7 @@ class FunctionPrototype(object):
     Args:
       argument (FunctionArgument): function argument.
     """
+    self._arguments_string = None
     self.arguments.append(argument)
 
   def AddArgumentString(self, argument_string):
@@ -120,20 +122,26 @@ class FunctionPrototype(object):
       argument_string (str): function argument.
     """
     function_argument = FunctionArgument(argument_string)
+    self._arguments_string = None
     self.arguments.append(function_argument)
 
   def CopyToString(self):
     """Copies the function prototype to a string.
 
+    The string is cached until another argument is added.
+
     Returns:
       str: function prototype.
     """
-    argument_strings = []
-    for function_argument in self.arguments:
-      argument_string = function_argument.CopyToString()
-      argument_strings.append(argument_string)
+    if self._arguments_string is None:
+      argument_strings = []
+      for function_argument in self.arguments:
+        argument_string = function_argument.CopyToString()
+        argument_strings.append(argument_string)
+
+      self._arguments_string = ', '.join(argument_strings)
 
-    return ', '.join(argument_strings)
+    return self._arguments_string
 
 
 class PythonTypeObjectFunctionPrototype(object):